@@ -0,0 +1,119 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+# distutils: extra_compile_args = -fopenmp
+# distutils: extra_link_args = -fopenmp
+"""
+Cython build of the slot spin/scan kernel. main.py prefers it over the Numba
+build when compiled, since it needs no JIT warm-up. Build it in place with:
+
+    cythonize -i _slot_kernel.pyx
+
+It splits the spins across OpenMP threads exactly like _slot_kernel_numba,
+so both builds give the same counts for the same seed when they run the same
+number of threads (OMP_NUM_THREADS and NUMBA_NUM_THREADS both default to the
+CPU count).
+"""
+import numpy as np
+
+cimport openmp
+from cython.parallel cimport prange
+from libc.stdint cimport int8_t, int32_t, int64_t, uint32_t, uint64_t
+from libc.string cimport memset
+
+cdef enum:
+    MAX_SYMBOLS = 128  # Symbols are int8, so no table can be longer than this
+    MAX_REELS = 64
+
+cdef uint64_t PCG_MULT = 6364136223846793005ULL
+
+
+cdef inline uint64_t _pcg32_below(uint64_t *state, uint64_t inc, uint64_t bound) noexcept nogil:
+    # Advance PCG32 (XSH-RR) and map its output onto [0, bound) with a
+    # multiply-high (Lemire) instead of a modulo
+    cdef uint64_t old = state[0]
+    cdef uint32_t xorshifted = <uint32_t>(((old >> 18) ^ old) >> 27)
+    cdef uint32_t rot = <uint32_t>(old >> 59)
+    cdef uint32_t output = (xorshifted >> rot) | (xorshifted << ((-rot) & 31))
+    state[0] = old * PCG_MULT + inc
+    return (<uint64_t>output * bound) >> 32
+
+
+cdef void _simulate_serial(const int8_t[:, ::1] reels_arr, const int32_t[::1] reel_lens,
+                           const int8_t[::1] is_wild, const int8_t[::1] is_premium, Py_ssize_t rows,
+                           Py_ssize_t num_spins, uint64_t seed, uint64_t stream,
+                           int64_t[:, ::1] counts) noexcept nogil:
+    # Same as _slot_kernel_numba._simulate_serial: num_spins spins on PCG32 stream `stream` of seed
+    cdef Py_ssize_t cols = reels_arr.shape[0]
+    cdef Py_ssize_t num_symbols = is_wild.shape[0]
+    cdef Py_ssize_t i, r, c
+    cdef Py_ssize_t stop[MAX_REELS]
+    cdef int8_t best[MAX_SYMBOLS]
+    cdef int symbol, current_symbol, current_count, wild_count
+    cdef uint64_t inc = (stream << 1) | 1
+    cdef uint64_t state = (inc + seed) * PCG_MULT + inc
+
+    for i in range(num_spins):
+        for c in range(cols):
+            stop[c] = <Py_ssize_t>_pcg32_below(&state, inc, reel_lens[c])
+
+        memset(best, 0, sizeof(best))
+        for r in range(rows):
+            # Same scan as main.SlotGameSimulator._find_all_rows, -1 meaning "no symbol yet"
+            current_symbol = -1
+            current_count = 0
+            wild_count = 0
+            for c in range(cols):
+                symbol = reels_arr[c, stop[c] + r]
+                if is_wild[symbol]:
+                    wild_count += 1
+                    if current_symbol != -1 and not is_premium[current_symbol]:
+                        current_count += 1
+                elif symbol == current_symbol:
+                    current_count += 1
+                else:
+                    if current_count >= 3 and current_count > best[current_symbol]:
+                        best[current_symbol] = current_count
+                    current_symbol = symbol
+                    current_count = 1 + (1 - is_premium[symbol]) * wild_count
+                    wild_count = 0
+
+            if current_count >= 3 and current_count > best[current_symbol]:
+                best[current_symbol] = current_count
+
+        for symbol in range(num_symbols):
+            if best[symbol] >= 3:
+                counts[best[symbol], symbol] += 1
+
+
+def run(const int8_t[:, ::1] reels_arr, const int32_t[::1] reel_lens, const int8_t[::1] is_wild,
+        const int8_t[::1] is_premium, Py_ssize_t rows, Py_ssize_t num_spins, uint64_t seed,
+        int64_t[:, ::1] counts):
+    """
+    Run num_spins spins across all OpenMP threads, each on its own PCG32
+    stream of seed, adding the prizes into counts[amount, symbol]. Takes the
+    same arguments as _slot_kernel_numba.run.
+    """
+    cdef Py_ssize_t cols = reels_arr.shape[0]
+    cdef Py_ssize_t num_symbols = is_wild.shape[0]
+    cdef Py_ssize_t nthreads = openmp.omp_get_max_threads()
+    cdef Py_ssize_t chunk = num_spins // nthreads
+    cdef Py_ssize_t t, a, s
+    cdef int64_t[:, :, ::1] counts_tl
+
+    if num_symbols > MAX_SYMBOLS:
+        raise ValueError(f"At most {MAX_SYMBOLS} symbols are supported, got {num_symbols}")
+    if cols > MAX_REELS:
+        raise ValueError(f"At most {MAX_REELS} reels are supported, got {cols}")
+
+    # One count matrix per thread, reduced into counts afterwards
+    counts_tl = np.zeros((nthreads, counts.shape[0], counts.shape[1]), np.int64)
+
+    with nogil:
+        for t in prange(nthreads, num_threads=nthreads, schedule='static', chunksize=1):
+            _simulate_serial(reels_arr, reel_lens, is_wild, is_premium, rows,
+                             num_spins - chunk * (nthreads - 1) if t == nthreads - 1 else chunk,
+                             seed, t, counts_tl[t])
+
+        for t in range(nthreads):
+            for a in range(counts.shape[0]):
+                for s in range(counts.shape[1]):
+                    counts[a, s] += counts_tl[t, a, s]
@@ -0,0 +1,181 @@
+"""
+Numba build of the slot spin/scan kernel, used by main.py when the Cython
+build (_slot_kernel) is not compiled.
+"""
+import hashlib
+import marshal
+import os
+
+import numpy as np
+from numba import get_num_threads, njit, prange
+from numba.core.caching import CompileResultCacheImpl, FunctionCache, UserWideCacheLocator
+
+
+class _BytecodeCacheLocator(UserWideCacheLocator):
+    """
+    Numba cache locator for kernels whose source file is not on disk (e.g. a
+    Nuitka build), keyed by a hash of the function's code object instead of the
+    file. The whole code object is hashed, so edited constants and referenced
+    names invalidate the cache, not just changed opcodes.
+    """
+
+    def __init__(self, py_func, py_file):
+        super().__init__(py_func, py_file)
+        self._bytecode_hash = hashlib.sha1(marshal.dumps(py_func.__code__)).hexdigest()
+
+    def get_source_stamp(self):
+        return self._bytecode_hash
+
+    def get_disambiguator(self):
+        return self._bytecode_hash[:16]
+
+    @classmethod
+    def from_function(cls, py_func, py_file):
+        self = cls(py_func, py_file)
+        try:
+            self.ensure_cache_path()
+        except OSError:
+            # Cannot ensure the cache directory exists or is writable
+            return None
+        return self
+
+
+class _BytecodeCacheImpl(CompileResultCacheImpl):
+    # Only this cache tries the bytecode locator; Numba's global locator list is left alone
+    _locator_classes = CompileResultCacheImpl._locator_classes + [_BytecodeCacheLocator]
+
+
+class _BytecodeFunctionCache(FunctionCache):
+    _impl_class = _BytecodeCacheImpl
+
+
+def _cached_njit(**options):
+    """
+    njit(cache=True), falling back to _BytecodeCacheLocator when the function's
+    source file is missing and Numba's own locators would refuse to cache it.
+    """
+    def decorate(func):
+        if os.path.exists(func.__code__.co_filename):
+            return njit(cache=True, **options)(func)
+        dispatcher = njit(**options)(func)
+        # What Dispatcher.enable_caching() does, with our cache class instead of FunctionCache
+        dispatcher._cache = _BytecodeFunctionCache(func)
+        return dispatcher
+    return decorate
+
+
+# PCG32 (XSH-RR) constants; everything stays in uint64 so Numba never promotes to float
+_PCG_MULT = np.uint64(6364136223846793005)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+@_cached_njit()
+def _pcg32_seed(seed, stream):
+    """Return the (state, inc) pair of a PCG32 generator on the given stream."""
+    inc = (np.uint64(stream) << np.uint64(1)) | np.uint64(1)
+    state = inc
+    state = (state + np.uint64(seed)) * _PCG_MULT + inc
+    return state, inc
+
+
+@_cached_njit()
+def _pcg32_below(state, inc, bound):
+    """
+    Advance PCG32 and map its 32-bit output onto [0, bound) with a single
+    multiply-high (Lemire) instead of a modulo. Returns (new_state, value).
+    """
+    xorshifted = (((state >> np.uint64(18)) ^ state) >> np.uint64(27)) & _MASK32
+    rot = state >> np.uint64(59)
+    output = ((xorshifted >> rot) | (xorshifted << ((np.uint64(32) - rot) & np.uint64(31)))) & _MASK32
+    return state * _PCG_MULT + inc, (output * np.uint64(bound)) >> np.uint64(32)
+
+
+@_cached_njit()
+def _evaluate_spin(reels_arr, stop, is_wild, is_premium, rows, best, counts):
+    """
+    Score the window shown at stop positions stop[c] and add its prizes into
+    counts[amount, symbol]. best is a scratch buffer with one slot per symbol.
+    """
+    cols = reels_arr.shape[0]
+    best[:] = 0
+    for r in range(rows):
+        # Same scan as main.SlotGameSimulator._find_all_rows, -1 meaning "no symbol yet"
+        current_symbol = -1
+        current_count = 0
+        wild_count = 0
+        for c in range(cols):
+            symbol = reels_arr[c, stop[c] + r]
+            if is_wild[symbol]:
+                wild_count += 1
+                if current_symbol != -1 and not is_premium[current_symbol]:
+                    current_count += 1
+            elif symbol == current_symbol:
+                current_count += 1
+            else:
+                if current_count >= 3 and current_count > best[current_symbol]:
+                    best[current_symbol] = current_count
+                current_symbol = symbol
+                current_count = 1 + (1 - is_premium[symbol]) * wild_count
+                wild_count = 0
+
+        if current_count >= 3 and current_count > best[current_symbol]:
+            best[current_symbol] = current_count
+
+    for symbol in range(best.shape[0]):
+        if best[symbol] >= 3:
+            counts[best[symbol], symbol] += 1
+
+
+@_cached_njit()
+def _simulate_serial(reels_arr, reel_lens, is_wild, is_premium, rows, num_spins, seed, stream, counts):
+    """
+    Run num_spins spins entirely in compiled code on the calling thread,
+    drawing stops from PCG32 stream `stream` of `seed`.
+
+    reels_arr is a padded int8 array with one reel per row; each reel of
+    length reel_lens[c] is followed by its first rows - 1 symbols so the
+    visible window never wraps. is_wild and is_premium are 0/1 int8 lookup
+    tables indexed by symbol. Prize combinations are accumulated into
+    counts[amount, symbol].
+    """
+    cols = reels_arr.shape[0]
+    stop = np.empty(cols, np.int64)
+    best = np.zeros(is_wild.shape[0], np.int8)
+    state, inc = _pcg32_seed(seed, stream)
+
+    for _ in range(num_spins):
+        for c in range(cols):
+            state, value = _pcg32_below(state, inc, reel_lens[c])
+            stop[c] = value
+        _evaluate_spin(reels_arr, stop, is_wild, is_premium, rows, best, counts)
+
+
+@_cached_njit(parallel=True)
+def _simulate(reels_arr, reel_lens, is_wild, is_premium, rows, num_spins, seed, nthreads, counts):
+    """
+    Split num_spins across nthreads workers, each running _simulate_serial
+    on its own PCG32 stream into its own slice of a per-thread count matrix,
+    then add the reduced counts into counts.
+    """
+    counts_tl = np.zeros((nthreads, counts.shape[0], counts.shape[1]), np.int64)
+    chunk = num_spins // nthreads
+
+    for t in prange(nthreads):
+        spins = num_spins - chunk * (nthreads - 1) if t == nthreads - 1 else chunk
+        _simulate_serial(reels_arr, reel_lens, is_wild, is_premium, rows, spins, seed, t, counts_tl[t])
+
+    counts += counts_tl.sum(axis=0)
+
+
+def run(reels_arr, reel_lens, is_wild, is_premium, rows, num_spins, seed, counts):
+    """
+    Run num_spins spins across all Numba threads, adding the prizes into
+    counts[amount, symbol]. See _simulate_serial for the layout of the
+    arguments; seed is a uint64 shared by all threads, each on its own stream.
+    """
+    _simulate(reels_arr, reel_lens, is_wild, is_premium, rows, num_spins, seed, get_num_threads(), counts)
+
+
+# Compile (or load from the cache) at import time so the first real run is hot
+run(np.zeros((1, 1), np.int8), np.ones(1, np.int32), np.zeros(1, np.int8), np.zeros(1, np.int8),
+    1, 1, np.uint64(0), np.zeros((1, 1), np.int64))
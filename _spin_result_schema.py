@@ -0,0 +1,103 @@
+"""
+msgspec schema of a slot-game spin result, used by
+formatter_python.format_spin_result. Kept out of formatter_python so that
+module imports without msgspec installed.
+"""
+from typing import Any
+
+import msgspec
+
+# Typed schema of a slot-game spin result, so msgspec can decode straight into
+# fixed-layout structs instead of building a dict per object. Field order
+# matches the payload's key order, which the encoder preserves.
+class Wins(msgspec.Struct):
+    progressive: int
+    regular: int
+    special_prize_freespin: int
+
+class Balances(msgspec.Struct):
+    cashable: int
+    promotional_non_restricted: int
+    promotional_restricted: int
+
+class PlayBet(msgspec.Struct):
+    bet_level_index: int
+    denomination_index: int
+    in_credits: int
+    in_currency: int
+    lines_index: int
+
+class Accounting(msgspec.Struct):
+    accumulated_wins: Wins
+    final_balances: Balances
+    payments: Wins
+    play_bet: PlayBet
+    start_balances: Balances
+    wagers: Balances
+    wins: Wins
+
+class FreeSpin(msgspec.Struct):
+    active: bool
+    additional_spins_stacked: list[Any]
+    base_previous_play: Any
+    element_count: int
+    end: bool
+    index: int
+    retrigger: bool
+    stacked: list[Any]
+    total: int
+    total_stacked: int
+    win: bool
+    win_spins: int
+
+class G150(msgspec.Struct):
+    index_reel_wild_bar_transform: list[Any]
+    wild_transformed: list[Any]
+
+class ReelsName(msgspec.Struct):
+    label: str
+    names: list[list[str]]
+
+class BetCoin(msgspec.Struct):
+    offset: int
+    type: int
+    value: int
+
+class GenericSlot(msgspec.Struct):
+    current_play_reel_type: int
+    next_play_reel_type: int
+    play_result_index: list[int]
+    prizes: list[Any]
+    reels: list[list[int]]
+    reels_name: list[ReelsName]
+    updated_bet_coins: list[list[BetCoin]]
+
+class ProgressivePrize(msgspec.Struct):
+    tier: int
+    value: int
+
+class Progressive(msgspec.Struct):
+    name: str
+    prize: ProgressivePrize
+    progressive_id: int
+    tier: list[int]
+
+class SpinResult(msgspec.Struct):
+    accounting: Accounting
+    active_type: str
+    currency: str
+    currency_symbol: str
+    emulation: bool
+    free_spin: FreeSpin
+    g150: G150
+    game_name: str
+    generic_slot: GenericSlot
+    mini_game_params: Any
+    play_seq: int
+    power_cycle: bool
+    progressive: list[Progressive]
+    replay: bool
+    status: str
+
+spin_result_decoder = msgspec.json.Decoder(SpinResult)
+spin_result_encoder = msgspec.json.Encoder()
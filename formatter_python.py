@@ -1,33 +1,166 @@
 import json
+import os
+import re
+import secrets
+import shutil
+import sys
+import tempfile
+
+# Optional fast paths; without them everything goes through json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Integer literals long enough that they may not fit in 64 bits, which orjson
+# would silently turn into floats. Matches inside strings too; that only costs
+# the slower fallback. The bytes twin serves bytes input, which both parsers accept.
+_LONG_INT = re.compile(r'(?<![\d.])\d{19,}(?![\d.eE])')
+_LONG_INT_BYTES = re.compile(_LONG_INT.pattern.encode())
 
 def format_json_string(json_string):
+    # orjson only supports 2-space indentation; output is always UTF-8 (no ASCII escaping).
+    # Payloads with very long integers, and anything orjson rejects (NaN, Infinity,
+    # 1e400, lone surrogates), go through json, which keeps them exact.
+    long_int = _LONG_INT if isinstance(json_string, str) else _LONG_INT_BYTES
     try:
-        parsed = json.loads(json_string)
-        return json.dumps(parsed, indent=4, ensure_ascii=False)
+        if orjson is not None and not long_int.search(json_string):
+            try:
+                return orjson.dumps(orjson.loads(json_string), option=orjson.OPT_INDENT_2).decode()
+            except orjson.JSONDecodeError:
+                pass  # Let json decide; its error messages are the ones callers have always seen
+        return json.dumps(json.loads(json_string), indent=2, ensure_ascii=False)
     except json.JSONDecodeError as e:
         return f"Invalid JSON: {e}"
 
+def format_spin_result(json_string, pretty=True):
+    # Schema-checked fast path for spin-result payloads; unknown keys are dropped.
+    # Needs msgspec, which only this function uses.
+    import msgspec
+    from _spin_result_schema import spin_result_decoder, spin_result_encoder
+
+    try:
+        encoded = spin_result_encoder.encode(spin_result_decoder.decode(json_string))
+    except msgspec.DecodeError as e:
+        return f"Invalid JSON: {e}"
+    if pretty:
+        encoded = msgspec.json.format(encoded, indent=2)
+    return encoded.decode()
+
+class _Unstreamable(Exception):
+    """Raised by _write_json_events for input the event stream cannot reproduce faithfully."""
+
+def _write_json_events(events, out, indent=4):
+    # Re-indent a stream of ijson basic_parse events straight to out, matching
+    # json.dumps(..., indent=indent, ensure_ascii=False) without building the tree
+    pad = ' ' * indent
+    depth = 0
+    first = True  # Nothing written yet in the innermost open container
+    after_key = False
+    keys = []  # Keys seen so far in each open container, None for arrays
+
+    for event, value in events:
+        if event in ('end_map', 'end_array'):
+            depth -= 1
+            keys.pop()
+            close = '}' if event == 'end_map' else ']'
+            out.write(close if first else '\n' + pad * depth + close)
+            first = False
+            continue
+
+        # yajl turns lone surrogate escapes into '?', and json.load keeps only the
+        # last of duplicate keys; either way the stream would differ from json
+        if event in ('map_key', 'string') and '?' in value:
+            raise _Unstreamable(f"string {value!r} may hold a replaced surrogate")
+
+        if event == 'map_key':
+            if value in keys[-1]:
+                raise _Unstreamable(f"duplicate key {value!r}")
+            keys[-1].add(value)
+            out.write(('' if first else ',') + '\n' + pad * depth + json.dumps(value, ensure_ascii=False) + ': ')
+            first = False
+            after_key = True
+            continue
+
+        # A value: array elements need their own separator and indentation
+        if depth and not after_key:
+            out.write(('' if first else ',') + '\n' + pad * depth)
+        after_key = False
+
+        if event in ('start_map', 'start_array'):
+            out.write('{' if event == 'start_map' else '[')
+            keys.append(set() if event == 'start_map' else None)
+            depth += 1
+            first = True
+        else:
+            out.write(json.dumps(value, ensure_ascii=False))
+            first = False
+
+def _open_sibling_tmp(path):
+    # Create the temporary file next to path with mode 0o666, so the kernel
+    # applies the umask just as open(path, 'w') would
+    directory, name = os.path.split(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f'.{name}.{secrets.token_hex(8)}.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    return tmp_path, os.fdopen(fd, 'w', encoding='utf-8')
+
 def format_json_file(input_path, output_path=None):
+    # Stream into a temporary file and only publish it once the whole input has
+    # parsed, so a parse error (or output_path == input_path) never leaves a
+    # truncated file or half-printed JSON behind
+    tmp_path = None
     try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if output_path:
+            tmp_path, tmp = _open_sibling_tmp(output_path)
+        else:
+            # surrogatepass round-trips lone surrogates, leaving it to stdout to accept or reject them
+            tmp = tempfile.TemporaryFile('w+', encoding='utf-8', errors='surrogatepass')
+
+        with tmp:
+            streamed = False
+            if ijson is not None:
+                try:
+                    with open(input_path, 'rb') as f:
+                        _write_json_events(ijson.basic_parse(f, use_float=True), tmp)
+                    streamed = True
+                except (ijson.JSONError, UnicodeDecodeError, _Unstreamable):
+                    # Input the yajl backend rejects or would alter (integers beyond int64,
+                    # NaN/Infinity, 1e400, surrogates, duplicate keys): redo it with json
+                    tmp.seek(0)
+                    tmp.truncate()
+
+            if not streamed:
+                with open(input_path, 'r', encoding='utf-8') as f:
+                    tmp.write(json.dumps(json.load(f), indent=4, ensure_ascii=False))
 
-        formatted_json = json.dumps(data, indent=4, ensure_ascii=False)
+            if not output_path:
+                tmp.seek(0)
+                shutil.copyfileobj(tmp, sys.stdout)
+                sys.stdout.write('\n')
 
         if output_path:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(formatted_json)
+            if os.path.exists(output_path):
+                shutil.copymode(output_path, tmp_path)
+            os.replace(tmp_path, output_path)
             print(f"Formatted JSON written to {output_path}")
-        else:
-            print(formatted_json)
 
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
 
 # Example usage:
 # Format a JSON string
 raw_json = '{"accounting":{"accumulated_wins":{"progressive":0,"regular":0,"special_prize_freespin":0},"final_balances":{"cashable":99999999,"promotional_non_restricted":99999999,"promotional_restricted":99999999},"payments":{"progressive":0,"regular":0,"special_prize_freespin":0},"play_bet":{"bet_level_index":0,"denomination_index":0,"in_credits":100,"in_currency":100,"lines_index":0},"start_balances":{"cashable":99999999,"promotional_non_restricted":99999999,"promotional_restricted":99999999},"wagers":{"cashable":100000,"promotional_non_restricted":0,"promotional_restricted":0},"wins":{"progressive":0,"regular":0,"special_prize_freespin":0}},"active_type":"default","currency":"US DOLLAR","currency_symbol":"$","emulation":false,"free_spin":{"active":false,"additional_spins_stacked":[],"base_previous_play":null,"element_count":3,"end":false,"index":0,"retrigger":false,"stacked":[],"total":5,"total_stacked":0,"win":true,"win_spins":5},"g150":{"index_reel_wild_bar_transform":[],"wild_transformed":[]},"game_name":"NewGame_CollapseLink","generic_slot":{"current_play_reel_type":1,"next_play_reel_type":0,"play_result_index":[57,119,29,32,58],"prizes":[],"reels":[[6,3,11],[2,10,6],[1,5,12],[6,3,12],[11,12,7]],"reels_name":[{"label":"Base Reels","names":[["ACE","CC","NINE"],["BB","TEN","ACE"],["AA","EE","FREE_SPIN"],["ACE","CC","FREE_SPIN"],["NINE","FREE_SPIN","KING"]]},{"label":"Wild Positions","names":[["-","-","-"],["-","-","-"],["-","-","-"],["-","-","-"],["-","-","-"]]}],"updated_bet_coins":[[{"offset":19,"type":0,"value":100},{"offset":20,"type":0,"value":250},{"offset":43,"type":0,"value":250},{"offset":45,"type":0,"value":150},{"offset":47,"type":0,"value":250},{"offset":97,"type":0,"value":100},{"offset":98,"type":0,"value":200},{"offset":101,"type":0,"value":200}],[{"offset":19,"type":0,"value":250},{"offset":20,"type":0,"value":150},{"offset":43,"type":0,"value":100},{"offset":45,"type":0,"value":200},{"offset":47,"type":0,"value":200},{"offset":97,"type":0,"value":250},{"offset":98,"type":0,"value":250},{"offset":101,"type":0,"value":200}],[{"offset":19,"type":0,"value":100},{"offset":20,"type":0,"value":100},{"offset":43,"type":0,"value":100},{"offset":45,"type":0,"value":150},{"offset":47,"type":0,"value":200},{"offset":96,"type":0,"value":150},{"offset":98,"type":0,"value":100},{"offset":101,"type":0,"value":150}],[{"offset":19,"type":0,"value":250},{"offset":20,"type":0,"value":100},{"offset":43,"type":0,"value":100},{"offset":45,"type":0,"value":250},{"offset":47,"type":0,"value":250},{"offset":97,"type":0,"value":200},{"offset":98,"type":0,"value":150},{"offset":101,"type":0,"value":250}],[{"offset":19,"type":0,"value":250},{"offset":20,"type":0,"value":200},{"offset":43,"type":0,"value":250},{"offset":45,"type":0,"value":200},{"offset":47,"type":0,"value":200},{"offset":97,"type":0,"value":100},{"offset":98,"type":2,"value":5000},{"offset":101,"type":0,"value":150}]]},"mini_game_params":null,"play_seq":41,"power_cycle":false,"progressive":[{"name":"Jackpot Link","prize":{"tier":-1,"value":0},"progressive_id":1,"tier":[2000,5000,100000,1500000]}],"replay":false,"status":"-3"}'
 print(format_json_string(raw_json))
 
+# Format a spin-result payload through its typed schema
+# print(format_spin_result(raw_json))
+
 # Format a JSON file (optional output to another file)
 # format_json_file("input.json", "output.json")
@@ -1,18 +1,35 @@
 import random
+import time
+import warnings
 from collections import defaultdict
 
+import numpy as np
+
+# Compiled spin/scan kernel: Cython build if compiled, else Numba, else pure Python
+try:
+    from _slot_kernel import run as _run_kernel
+except ImportError:
+    try:
+        from _slot_kernel_numba import run as _run_kernel
+    except ImportError:
+        _run_kernel = None
+        warnings.warn("Neither the Cython nor the Numba slot kernel is available; "
+                      "falling back to the much slower pure Python simulation", RuntimeWarning)
+
+NUM_SYMBOLS = 14  # Symbols are 0-13
+PROGRESS_INTERVAL = 1 << 20  # Spins between progress reports
+
 
 class SlotGameSimulator:
-    def __init__(self, reels, symbols):
+    def __init__(self, reels):
         """
         Initialize the slot game simulator.
 
         Args:
-            reels (list of lists): The reels configuration (m rows x n columns)
-            symbols (list): List of possible symbols in the game (0-13)
+            reels (list of lists): The reels configuration (m rows x n columns),
+                                   using symbols 0 to NUM_SYMBOLS - 1
         """
         self.reels = reels
-        self.symbols = symbols
         self.rows = 3  # We always display 3 rows
         self.cols = len(reels)
         self.WILD = 0  # Define which symbol is the wild/joker
@@ -22,6 +39,31 @@ class SlotGameSimulator:
         for i, reel in enumerate(reels):
             if len(reel) < self.rows:
                 raise ValueError(f"Reel {i} is too short (length {len(reel)}), needs at least {self.rows} symbols")
+            # The lookup tables and compiled kernels index by symbol without bounds checks
+            for pos, symbol in enumerate(reel):
+                if symbol not in range(NUM_SYMBOLS):
+                    raise ValueError(f"Reel {i} has invalid symbol {symbol!r} at position {pos}, "
+                                     f"symbols must be 0-{NUM_SYMBOLS - 1}")
+
+        # Each reel followed by its first rows - 1 symbols, so the visible window never wraps
+        self._reels_ext = [list(reel) + list(reel[:self.rows - 1]) for reel in reels]
+
+        # Dense copy of the wrapped reels for the compiled kernel: one byte per symbol
+        max_len = max(len(reel) for reel in self._reels_ext)
+        self.reels_arr = np.zeros((self.cols, max_len), dtype=np.int8)
+        for col, reel in enumerate(self._reels_ext):
+            self.reels_arr[col, :len(reel)] = reel
+        self.reel_lens = np.array([len(reel) for reel in reels], dtype=np.int32)
+        self.rng = np.random.default_rng()
+
+        # Premium flag per symbol; tuple indexing beats set membership in the Python scan
+        self._premium_lookup = tuple(symbol in self.PREMIUM_SYMBOLS for symbol in range(NUM_SYMBOLS))
+
+        # 0/1 symbol lookup tables for the kernel's sequence scan
+        self._is_wild = np.zeros(NUM_SYMBOLS, dtype=np.int8)
+        self._is_wild[self.WILD] = 1
+        self._is_premium = np.zeros(NUM_SYMBOLS, dtype=np.int8)
+        self._is_premium[list(self.PREMIUM_SYMBOLS)] = 1
 
     def spin(self):
         """
@@ -29,75 +71,76 @@ class SlotGameSimulator:
 
         Returns:
             tuple: (result_grid, prizes)
-                   result_grid: 3x5 grid of symbols
-                   prizes: list of prize dictionaries {symbol: x, amount: y}
+                   result_grid: 3x5 grid of symbols, flattened row by row (15 symbols)
+                   prizes: list of (symbol, amount) tuples, one per winning symbol
         """
         # Choose random stop positions for each reel
         stop_positions = [random.randint(0, len(reel) - 1) for reel in self.reels]
 
-        # Build the result grid (3 rows x 5 columns)
-        result_grid = []
-        for row in range(self.rows):
-            result_row = []
-            for col in range(self.cols):
-                reel = self.reels[col]
-                pos = (stop_positions[col] + row) % len(reel)
-                result_row.append(reel[pos])
-            result_grid.append(result_row)
+        result_grid = self._build_grid(stop_positions)
 
         # Find all winning combinations
         prizes = self._calculate_prizes(result_grid)
 
         return result_grid, prizes
 
+    def _build_grid(self, stop_positions):
+        """Build the flat, row-major result grid (3 rows x 5 columns) for the given stops."""
+        reels_ext = self._reels_ext
+        return [reels_ext[col][stop + row] for row in range(self.rows) for col, stop in enumerate(stop_positions)]
+
     def _calculate_prizes(self, grid):
         """
-        Calculate prizes from the result grid with wild symbol (0) support.
+        Calculate prizes from the flattened result grid with wild symbol (0) support.
         Premium symbols (12,13) only form wins in pure sequences (no wilds).
         """
-        prizes = []
-
-        # Check each row
-        for row in grid:
-            # Find all possible sequences in this row
-            row_prizes = self._find_sequences(row)
-            if row_prizes:
-                prizes.extend(row_prizes)
+        # Highest sequence count per symbol across all rows
+        best = [0] * NUM_SYMBOLS
+        self._find_all_rows(grid, best)
 
-        # Only keep the highest prize for each symbol
-        max_prizes = {}
-        for prize in prizes:
-            symbol = prize['symbol']
-            if symbol not in max_prizes or prize['amount'] > max_prizes[symbol]['amount']:
-                max_prizes[symbol] = prize
+        return [(symbol, best[symbol]) for symbol in range(NUM_SYMBOLS) if best[symbol] >= 3]
 
-        return list(max_prizes.values())
-
-    def _find_sequences(self, symbols):
+    def _find_all_rows(self, grid, best):
         """
-        Find all winning sequences in a list of symbols, with special handling for:
+        Find all winning sequences in every row of a flattened grid in one pass,
+        with special handling for:
         - Wilds (0) can substitute for any symbol except premium symbols (12,13)
         - Premium symbols only form wins in pure sequences (no wilds)
+
+        Sequences never continue across a row boundary. best is updated in place
+        with the highest count seen for each symbol.
         """
-        sequences = {}
+        # Bind constants to locals once per call instead of looking them up per symbol
+        wild = self.WILD
+        is_premium = self._premium_lookup
+        cols = self.cols
+
         current_symbol = None
         current_count = 0
         wild_count = 0
 
-        for i, symbol in enumerate(symbols):
+        for i, symbol in enumerate(grid):
+            # Row boundary: settle the run in flight and start the next row afresh
+            if i % cols == 0:
+                if current_count >= 3 and current_symbol is not None and current_count > best[current_symbol]:
+                    best[current_symbol] = current_count
+                current_symbol = None
+                current_count = 0
+                wild_count = 0
+
             # Handle wild symbol
-            if symbol == self.WILD:
+            if symbol == wild:
                 wild_count += 1
-                if current_symbol is not None and current_symbol not in self.PREMIUM_SYMBOLS:
+                if current_symbol is not None and not is_premium[current_symbol]:
                     current_count += 1
                 continue
 
             # Handle premium symbols (require pure sequences)
-            if symbol in self.PREMIUM_SYMBOLS:
+            if is_premium[symbol]:
                 # Reset if we were in a different sequence
                 if current_symbol != symbol:
-                    if current_count >= 3 and current_symbol is not None:
-                        self._update_sequences(sequences, current_symbol, current_count)
+                    if current_count >= 3 and current_symbol is not None and current_count > best[current_symbol]:
+                        best[current_symbol] = current_count
                     current_symbol = symbol
                     current_count = 1
                     wild_count = 0
@@ -110,56 +153,73 @@ class SlotGameSimulator:
                 current_count += 1
             else:
                 # Reset if we were in a different sequence
-                if current_count >= 3 and current_symbol is not None:
-                    self._update_sequences(sequences, current_symbol, current_count)
+                if current_count >= 3 and current_symbol is not None and current_count > best[current_symbol]:
+                    best[current_symbol] = current_count
 
                 # Start new sequence with any leading wilds
                 current_symbol = symbol
                 current_count = 1 + wild_count
                 wild_count = 0
 
-        # Check final sequence
-        if current_count >= 3 and current_symbol is not None:
-            self._update_sequences(sequences, current_symbol, current_count)
+        # Check final sequence of the last row
+        if current_count >= 3 and current_symbol is not None and current_count > best[current_symbol]:
+            best[current_symbol] = current_count
 
-        # Convert to prize format
-        return [{"symbol": sym, "amount": cnt} for sym, cnt in sequences.items()]
-
-    def _update_sequences(self, sequences, symbol, count):
-        """Update sequences dictionary with the best count for each symbol"""
-        if symbol not in sequences or count > sequences[symbol]:
-            sequences[symbol] = count
+    def _python_run(self, stops, counts):
+        """
+        Pure-Python stand-in for the compiled kernels: evaluate one spin per row
+        of stops and add its prizes into counts[amount, symbol].
+        """
+        for stop_positions in stops.tolist():
+            for symbol, amount in self._calculate_prizes(self._build_grid(stop_positions)):
+                counts[amount, symbol] += 1
 
     def run_simulation(self, num_spins):
         """
         Run multiple simulations and collect statistics.
+
+        Prizes are tallied in a fixed (amount, symbol) NumPy matrix, returned as
+        stats['combo_counts']; the dict-based entries are derived from it.
         """
-        stats = {
-            'total_spins': 0,
-            'total_prizes': 0,
-            'prize_combinations': defaultdict(int),  # Count of each prize combination (amount, symbol)
-            'amount_counts': defaultdict(int),  # Count of each prize amount (3, 4, 5)
-            'symbol_counts': defaultdict(int)  # Count of prizes per symbol
+        # Count of each prize combination, indexed [amount, symbol]. A sequence can
+        # span every column, and the kernels index this without bounds checks.
+        combo_counts = np.zeros((self.cols + 1, NUM_SYMBOLS), dtype=np.int64)
+
+        # Run in chunks so progress can be reported without touching the hot loop.
+        # The compiled kernels draw their own stops from PCG32, seeded per chunk from self.rng;
+        # the Python fallback gets one batched RNG call per chunk instead.
+        for done in range(0, num_spins, PROGRESS_INTERVAL):
+            if done:
+                print('iteration', done)
+            batch = min(PROGRESS_INTERVAL, num_spins - done)
+            if _run_kernel is not None:
+                seed = self.rng.integers(1 << 63, dtype=np.uint64)
+                _run_kernel(self.reels_arr, self.reel_lens, self._is_wild, self._is_premium, self.rows,
+                            batch, seed, combo_counts)
+            else:
+                stops = self.rng.integers(self.reel_lens, size=(batch, self.cols), dtype=np.int32)
+                self._python_run(stops, combo_counts)
+
+        amount_counts = combo_counts.sum(axis=1)
+        symbol_counts = combo_counts.sum(axis=0)
+
+        # Materialize the nonzero entries as dicts for reporting
+        amounts, symbols = np.nonzero(combo_counts)
+        return {
+            'total_spins': num_spins,
+            'total_prizes': int(combo_counts.sum()),
+            'combo_counts': combo_counts,
+            'prize_combinations': defaultdict(int, {  # Count of each prize combination (amount, symbol)
+                (int(amount), int(symbol)): int(combo_counts[amount, symbol]) for amount, symbol in zip(amounts, symbols)
+            }),
+            'amount_counts': defaultdict(int, {  # Count of each prize amount (3, 4, 5)
+                int(amount): int(amount_counts[amount]) for amount in np.flatnonzero(amount_counts)
+            }),
+            'symbol_counts': defaultdict(int, {  # Count of prizes per symbol
+                int(symbol): int(symbol_counts[symbol]) for symbol in np.flatnonzero(symbol_counts)
+            }),
         }
 
-        for _ in range(num_spins):
-            print('iteration', _)
-            _, prizes = self.spin()
-            stats['total_spins'] += 1
-
-            if prizes:
-                stats['total_prizes'] += len(prizes)
-
-                for prize in prizes:
-                    # Track combination of amount and symbol
-                    combo = (prize['amount'], prize['symbol'])
-                    stats['prize_combinations'][combo] += 1
-                    # Track individual counts
-                    stats['amount_counts'][prize['amount']] += 1
-                    stats['symbol_counts'][prize['symbol']] += 1
-
-        return stats
-
 
 # Example usage
 if __name__ == "__main__":
@@ -793,17 +853,18 @@ if __name__ == "__main__":
           ]
         ]
 
-    symbols = list(range(14))
-
     # Create simulator
-    simulator = SlotGameSimulator(reels, symbols)
+    simulator = SlotGameSimulator(reels)
 
     # Run simulation
     num_spins = 100000000
+    start = time.perf_counter()
     stats = simulator.run_simulation(num_spins)
+    elapsed = time.perf_counter() - start
 
     # Print results
     print(f"Simulation Results ({num_spins} spins):")
+    print(f"Elapsed time: {elapsed:.2f}s")
     print(f"Total games played: {stats['total_spins']}")
     print(f"Total prizes won: {stats['total_prizes']}")
 